@@ -11,79 +11,77 @@
 # number of seconds that have already passed during the simulation before the
 # customer arrives. When a customer is removed from the queue (their car is
 # washed), we can then calculate the number of seconds they waited.
+# 
+# Customers leave the queue in the same order they joined it, and at most one
+# arrives per second, so the queue can be a preallocated array of integers
+# with two indices: new timestamps are written at `tail` and the next customer
+# to be washed is read from `head`. Adding or removing a customer is then just
+# moving one of the indices forward.
 
 # %%
-from collections import deque
+import numpy as np
 
 # %% [markdown]
 # ### The `washer` object
 # 
 # Instances of the `washer` class simulate the machine that washes cars. Its
 # constructor will take one parameter (in addition to `self`): the number of
-# seconds needed to wash a car, `wash_time`. When the washer starts washing,
-# sets its `time_until_done` attribute equal to `wash_time`.
+# seconds needed to wash a car, `wash_time`. When the washer starts washing at
+# second `now`, it sets its `busy_until` attribute to `now + wash_time`, the
+# second at which it will be free again.
 # 
-# Each time another second passes, the simulation program will indicate the
-# passage of one second for the washer. This is done by the instance method
-# `washer.one_second()`.
+# The washer doesn't need to be told every time another second passes. Instead,
+# whoever uses the washer passes in the current second, `now`, whenever they ask
+# it something, and the washer compares that with `busy_until`.
 # 
 # The washer needs to be able to tell the rest of the program whether it is
 # currently busy, and to start washing the next car in the queue. These are
-# done via member functions `washer.is_busy()` and `washer.wash()`.
+# done via member functions `washer.is_busy(now)` and
+# `washer.start_washing(now)`.
 
 # %%
 class Washer:
-    """The washer knows whether it is washing, and if it is, how long it will be until the
+    """The washer knows whether it is washing, and if it is, when the
     next car can exit the waiting queue.
     """
     def __init__(self, wash_time):
         """Sets up a Washer instance. Make sure you know what the instance attributes should be!"""
         
         self.wash_time = wash_time
-        self.time_until_done = 0
+        self.busy_until = 0
 
-    def is_busy(self):
-        """Return True if the washer is currently washing (so no car can
+    def is_busy(self, now):
+        """Return True if the washer is washing at second `now` (so no car can
         exit the queue yet) and False if not (the next car can be dequeued)."""
         
-        if self.time_until_done != 0:
-            return True
-        else:
-            return False
+        return now < self.busy_until
 
-    def start_washing(self):
+    def start_washing(self, now):
         """Tell the washer to wash the car at the front of the
-        queue by updating its attributes appropriately."""
-        
-        if self.is_busy() == False:
-            self.time_until_done = self.wash_time
-
-    def one_second(self):
-        """Update the washer's attributes to reflect the passage of one second."""
+        queue, starting at second `now`, by updating its attributes appropriately."""
         
-        if self.time_until_done != 0:
-            self.time_until_done = self.time_until_done - 1
+        if now >= self.busy_until:
+            self.busy_until = now + self.wash_time
 
 # %%
 # Check that the Washer class does what it is supposed to:
 from nose.tools import assert_equal
 w = Washer(100)
 assert_equal(w.wash_time, 100)
-assert_equal(w.time_until_done, 0)
+assert_equal(w.busy_until, 0)
 for key in vars(w):
-    assert(key in ('wash_time', 'time_until_done'))
-
-w.time_until_done = 1
-assert(w.is_busy())
-w.time_until_done = 0
-assert(not w.is_busy())
+    assert(key in ('wash_time', 'busy_until'))
 
-w.start_washing()
-assert_equal(w.time_until_done, w.wash_time)
+w.busy_until = 11
+assert(w.is_busy(10))
+assert(not w.is_busy(11))
 
-w.time_until_done = 10
-w.one_second()
-assert_equal(w.time_until_done, 9)
+w.start_washing(11)
+assert_equal(w.busy_until, 11 + w.wash_time)
+w.start_washing(12)
+assert_equal(w.busy_until, 11 + w.wash_time)
+assert(w.is_busy(110))
+assert(not w.is_busy(111))
 
 # %% [markdown]
 # ### Managing arrivals
@@ -98,7 +96,8 @@ assert_equal(w.time_until_done, 9)
 # instance method `ArrivalGenerator.query()` that returns either `True` or
 # `False`, with `True` occurring with probability given by the constructor's
 # argument. We'll use some helper functions from the `random` module to generate
-# these random occurrences.
+# these random occurrences. When we want the answers for many seconds at once,
+# `ArrivalGenerator.query_many(n)` returns all `n` of them in a NumPy array.
 
 # %%
 import random
@@ -106,19 +105,30 @@ import random
 class ArrivalGenerator:
     def __init__(self, prob=0.5):
         """The ArrivalGenerator has one job: return True with probability `prob`.
-        To do that, it needs to save the value of `prob`.
+        To do that, it needs to save the value of `prob`. It also saves `prob`
+        scaled up to a 30-bit whole number, so `query()` can compare random bits
+        without making a float every time.
         """
         
         self.probability = prob
+        self.threshold_bits = int(prob * (1 << 30))
 
-    def query(self):
-        """Return True with probability prob. There are many different ways 
-        you might use the `random` module's functions
-        to do it. If you want a hint, please ask, I don't want you to get hung up on the
-        math of probability too much."""
+    def query(self, _bits=random.getrandbits):
+        """Return True with probability prob. A random 30-bit number is below
+        `threshold_bits` with probability `threshold_bits / 2**30`, which is prob
+        to within about one in a billion."""
         
-        while self.probability >= random.random():
-            return True
+        return _bits(30) < self.threshold_bits
+
+    def query_many(self, n, rng=None):
+        """Return a NumPy array of `n` booleans, one per second, each True
+        with probability prob. Unlike `query()`, this compares `n` floats from
+        the NumPy `Generator` `rng` (a fresh one if not given) with
+        `probability` in one call."""
+        
+        if rng is None:
+            rng = np.random.default_rng()
+        return rng.random(n) < self.probability
 
 
 # %%
@@ -129,6 +139,16 @@ assert_equal(a.probability, 0.5)
 a = ArrivalGenerator(0.9)
 assert_equal(a.probability, 0.9)
 
+never = ArrivalGenerator(0)
+assert(not any(never.query() for _ in range(10_000)))
+always = ArrivalGenerator(1)
+assert(all(always.query() for _ in range(10_000)))
+# A probability of 2**-30 is the smallest query() can tell apart from 0, so it
+# should (almost certainly) not come up in ten thousand tries either.
+rare = ArrivalGenerator(2**-30)
+assert_equal(rare.threshold_bits, 1)
+assert(not any(rare.query() for _ in range(10_000)))
+
 arrivals_list = (a.query() for _ in range(1_000_000))
 number_of_arrivals = sum([1 for x in arrivals_list if x])
 # You should get something very close to 900000
@@ -136,6 +156,11 @@ assert(899000 < number_of_arrivals and number_of_arrivals < 901000)
 # If it fails, but you think you are right, just try again. It is probabilistic,
 # so could be false negative. But two false negatives is unlikely to happen.
 
+assert(type(a.query()) is bool)
+arrivals_array = a.query_many(1_000_000)
+assert_equal(arrivals_array.shape, (1_000_000,))
+assert(899000 < arrivals_array.sum() and arrivals_array.sum() < 901000)
+
 # %% [markdown]
 # ### Tracking the average waiting time
 # 
@@ -202,20 +227,24 @@ assert(at.average() == sum(random_value_list)/len(random_value_list))
 # %% [markdown]
 # ### Pseudocode for main program
 # 
+# This is the plan for a main program built from the objects above, one second
+# at a time. The `simulation` function further down gets the same results with a
+# faster plan, described before it, that keeps the washer's `busy_until` in a
+# local variable instead of using a `Washer`.
+# 
 # <ol style="list-style-type: upper-roman">
 #     <li>Initialize the input values for the program. These are arrival probability and simulation time.</li>
 #     <li>Initialize a <tt>Washer</tt> instance, making sure to supply a value for its parameter (how long it takes to wash a car).</li>
-#     <li>Initialize instances of <tt>ArrivalGenerator</tt>, <tt>AverageTracker</tt>, and <tt>deque</tt>.</li>
+#     <li>Initialize instances of <tt>ArrivalGenerator</tt> and <tt>AverageTracker</tt>, and an empty queue (the integer array with a <tt>head</tt> and a <tt>tail</tt> described at the top).</li>
 #     <li>For each integer between 0 and the simulation time:</li>
 #     <ol style="list-style-type: upper-alpha">
 #         <li>Ask the <tt>ArrivalGenerator</tt> whether a new customer arrives during the current second. If so, enqueue the value of the current second.</li>
-#         <li>If the <tt>Washer</tt> is not busy and the queue is not empty:</li>
+#         <li>If the <tt>Washer</tt> is not busy at the current second (<tt>is_busy(current_second)</tt> is False) and the queue is not empty:</li>
 #         <ol style="list-style-type: arabic">
 #             <li>Remove the next value from the queue. This is the arrival timestamp of the car about to get washed.</li>
 #             <li>Compute how long the next car had to wait, and send that value to the <tt>AverageTracker</tt>.</li>
-#             <li>Tell the <tt>Washer</tt> to start washing the next car in line.</li>
+#             <li>Tell the <tt>Washer</tt> to start washing the next car in line at the current second (<tt>start_washing(current_second)</tt>). The washer works out for itself when it will be free again.</li>
 #         </ol>
-#             <li>Tell the <tt>Washer</tt> another second has passed. (This is how the washer knows when it is no longer busy.)</li>
 #     </ol>
 #     <li>Now the simulation is done. Print a report including the simulation time and probability, number of cars washed, and average waiting time. Example:<br/>
 #         <tt>Simulation complete<br/>
@@ -232,70 +261,330 @@ assert(at.average() == sum(random_value_list)/len(random_value_list))
 # 
 # You should get realistic values with the probability, simulation time, and wash time that are provided.
 
+# %% [markdown]
+# ### A faster main program
+# 
+# Following the pseudocode literally asks the `ArrivalGenerator` and the `Washer`
+# something on every one of the `simulation_time` seconds, even though at the
+# given probability a car only shows up every 250 seconds or so. Ten thousand
+# runs of that is sixty million trips around the loop, almost all of them to
+# learn that nothing happened.
+# 
+# Instead, we ask `ArrivalGenerator.query_many()` for every arrival of the whole
+# simulation at once and only visit the seconds at which a car arrives. Like the
+# `Washer`, we only need to remember `busy_until`, the second at which the washer
+# is free again.
+# 
+# We don't even need a separate queue. Cars arrive in order of their timestamps
+# and are washed in the same order, so at any moment the cars waiting in line are
+# just the next few entries of `arrivals`: the queue's `head` is the position of
+# the next car to be washed in `arrivals`. Walking through `arrivals` once, each
+# car starts being washed at `max(busy_until, timestamp)` (when it arrives, or
+# when the car before it is done) and keeps the washer busy for `wash_time`
+# seconds after that. The first car that would start after the simulation ends
+# is never washed, and neither is anyone behind it. The waiting times are added
+# up as we go in two plain integers, `total_wait` and `count`, so the average is
+# one division at the end and no `AverageTracker` is needed. The report is only
+# printed when `verbose` is True, so running the simulation many times doesn't
+# flood the output.
+# 
+# This loop runs in plain Python, so everything it touches is a local variable:
+# `busy_until` rather than a `Washer` attribute, and the arrivals as a Python
+# list of Python integers rather than a NumPy array, whose elements would each
+# have to be turned into a NumPy scalar when read.
+
 # %%
-from collections import deque
+import numpy as np
 
 prob = 0.004
 simulation_time = 6000
 wash_time = 150
 
-def simulation(prob, simulation_time, wash_time):
-    ws = Washer(wash_time)
+def simulation(prob, simulation_time, wash_time, rng=None, verbose=False):
     arg = ArrivalGenerator(prob)
-    avg_wash_time = AverageTracker()
-    wash_deque = deque()
+    arrivals = np.flatnonzero(arg.query_many(simulation_time, rng)).tolist()
+    busy_until = 0
+    total_wait = 0
+    count = 0
+    for timestamp in arrivals:
+        service_start = busy_until if busy_until > timestamp else timestamp
+        if service_start >= simulation_time:
+            break
+        total_wait += service_start - timestamp
+        count += 1
+        busy_until = service_start + wash_time
+    avg_time = total_wait / count
+    if verbose:
+        print(f"In {simulation_time} seconds with probability {prob}: washed {count} cars with average waiting time {avg_time} seconds.")
+    return count, avg_time
+
+# %%
+# Check that the same Generator seed gives the same simulation:
+from nose.tools import assert_equal
+assert_equal(simulation(0.004, 6000, 150, np.random.default_rng(42)),
+             simulation(0.004, 6000, 150, np.random.default_rng(42)))
+
+# %% [markdown]
+# ### Compiling the simulation
+# 
+# The simulation is a tight loop over whole numbers, which is exactly what
+# Numba's `@njit` compiles well. `simulation_nb` is the pseudocode above written
+# with plain local variables in place of the `Washer`, `ArrivalGenerator` and
+# `AverageTracker` objects, so Numba can compile it without touching any Python
+# objects. The queue is the integer array with a `head` and a `tail` described
+# at the top: since it holds every arrival in order, it plays the part of
+# `arrivals` in `simulation`. Each second appends at most one car, so
+# `simulation_time` slots are always enough. Like `simulation`, it draws its
+# random numbers from a NumPy `Generator`, `rng`, which Numba can use directly.
+# `simulation_jit` is the same report as `simulation`, using the compiled
+# version.
+# 
+# Numba compiles `simulation_nb` the first time it is called, which takes a
+# moment. Running `python car_wash_aot.py` compiles a copy of the same loop ahead
+# of time into the `car_wash_sim` module. When it has been built,
+# `simulation_jit` uses it instead, so a one-off report doesn't wait for Numba.
+# Numba's ahead-of-time compiler can't take a `Generator`, so that copy draws
+# from Numba's own random stream and `simulation_jit` ignores `rng`. Only `simulation_jit` skips the compile: the checks
+# below and `ten_thousand_runs` still call `simulation_nb`, so running the whole
+# notebook compiles it either way. Since `car_wash_sim` is a copy, the cell after
+# the next one checks that it still agrees with `simulation_nb` whenever it is
+# there. If Numba isn't an option,
+# `car_wash_cy.pyx` is the same loop written in Cython (see the README for how to
+# build either).
+
+# %%
+from numba import njit
+
+@njit(cache=True)
+def simulation_nb(prob, simulation_time, wash_time, rng):
+    q = np.empty(simulation_time, np.int32)
+    head = 0
+    tail = 0
+    busy_until = 0
+    total_wait = 0
+    count = 0
     for current_second in range(simulation_time):
-        if arg.query() == True:
-            wash_deque.appendleft(current_second)
-        if ws.is_busy() == False and len(wash_deque) != 0:
-            timestamp = wash_deque.pop()
-            avg_wash_time.next_value(current_second - timestamp)
-            ws.start_washing()
-        ws.one_second()
-    avg_time = avg_wash_time.average()
-    count = avg_wash_time.number_of_values()
-    print(f"In {simulation_time} seconds with probability {prob}: washed {count} cars with average waiting time {avg_time} seconds.")
+        if rng.random() < prob:
+            q[tail] = current_second
+            tail += 1
+        if current_second >= busy_until and head < tail:
+            total_wait += current_second - q[head]
+            head += 1
+            count += 1
+            busy_until = current_second + wash_time
+    return count, total_wait / count
+
+try:
+    from car_wash_sim import simulate as simulation_aot
+except ImportError:
+    simulation_aot = None
+
+def simulation_jit(prob, simulation_time, wash_time, rng=None, verbose=False):
+    if simulation_aot is not None:
+        count, avg_time = simulation_aot(prob, simulation_time, wash_time)
+    else:
+        if rng is None:
+            rng = np.random.default_rng()
+        count, avg_time = simulation_nb(prob, simulation_time, wash_time, rng)
+    if verbose:
+        print(f"In {simulation_time} seconds with probability {prob}: washed {count} cars with average waiting time {avg_time} seconds.")
     return count, avg_time
 
+simulation(prob, simulation_time, wash_time, verbose=True)
+simulation_jit(prob, simulation_time, wash_time, verbose=True)
+
+# %%
+# If car_wash_sim has been built, check that it agrees with simulation_nb:
+if simulation_aot is not None:
+    nb_rng = np.random.default_rng()
+    aot_counts = np.empty(2000, np.int32)
+    aot_averages = np.empty(2000)
+    nb_counts = np.empty(2000, np.int32)
+    nb_averages = np.empty(2000)
+    for i in range(2000):
+        aot_counts[i], aot_averages[i] = simulation_aot(0.004, 6000, 150)
+        nb_counts[i], nb_averages[i] = simulation_nb(0.004, 6000, 150, nb_rng)
+    assert(abs(aot_counts.mean() - nb_counts.mean()) < 0.5)
+    assert(abs(aot_averages.mean() - nb_averages.mean()) < 10)
+    # This is probabilistic, so rerun it once if it fails.
+
+# %% [markdown]
+# ### Skipping the clock altogether
+# 
+# Each second a car arrives with probability `prob`, so the number of arrivals in
+# the whole simulation follows a binomial distribution, and given how many cars
+# arrive, every set of that many distinct seconds is equally likely. That means
+# we can draw the arrival timestamps directly, without looking at the seconds in
+# between.
+# 
+# The washing can also be worked out without following the clock. Car `i` starts
+# being washed either when it arrives or when car `i - 1` is done, whichever is
+# later:
+# 
+# ```python
+# start[i] = max(arrival[i], start[i - 1] + wash_time)
+# ```
+# 
+# Subtracting `i * wash_time` from both sides turns this into a running maximum,
+# 
+# ```python
+# start[i] - i * wash_time = max(arrival[i] - i * wash_time,
+#                                start[i - 1] - (i - 1) * wash_time)
+# ```
+# 
+# which `np.maximum.accumulate` computes for the whole array in one call. The
+# cars served are the ones whose wash starts before the simulation ends.
+# `analytic_simulation` returns the same count and average as `simulation`, but
+# its work only depends on the number of cars, not on `simulation_time`.
+
+# %%
+def analytic_simulation(prob, simulation_time, wash_time, rng=None):
+    if rng is None:
+        rng = np.random.default_rng()
+    num_arrivals = rng.binomial(simulation_time, prob)
+    arrivals = np.sort(rng.choice(simulation_time, num_arrivals, replace=False))
+    offsets = np.arange(num_arrivals) * wash_time
+    starts = np.maximum.accumulate(arrivals - offsets) + offsets
+    served = starts < simulation_time
+    count = int(np.count_nonzero(served))
+    avg_time = int((starts[served] - arrivals[served]).sum()) / count
+    return count, avg_time
+
+# %%
+# Check that analytic_simulation agrees with the compiled simulation:
+analytic_counts = np.empty(2000, np.int32)
+analytic_averages = np.empty(2000)
+compiled_counts = np.empty(2000, np.int32)
+compiled_averages = np.empty(2000)
+compiled_rng = np.random.default_rng()
+for i in range(2000):
+    analytic_counts[i], analytic_averages[i] = analytic_simulation(0.004, 6000, 150)
+    compiled_counts[i], compiled_averages[i] = simulation_nb(0.004, 6000, 150, compiled_rng)
+assert(abs(analytic_counts.mean() - compiled_counts.mean()) < 0.5)
+assert(abs(analytic_averages.mean() - compiled_averages.mean()) < 10)
+# Like the ArrivalGenerator check, this is probabilistic, so rerun it once if it fails.
+
+assert_equal(analytic_simulation(0.004, 6000, 150, np.random.default_rng(42)),
+             analytic_simulation(0.004, 6000, 150, np.random.default_rng(42)))
+
 # %% [markdown]
 # ### SIMULATE
 # 
-# Run your simulation ten thousand times (it will take a minute or two). Store the
-# results in two lists. Each run of the simulation produces a count and an
-# average. After each run, capture these values. Append the count to the list of
-# counts and the average to the list of averages. Return the two lists at once,
-# like this:
+# Run your simulation ten thousand times. Store the results in two arrays, made
+# with `np.empty` before the first run so they never have to grow. Each run of
+# the simulation produces a count and an average. After each run, capture these
+# values: the count goes into its slot in the array of counts (`int32` is plenty
+# for a count of cars) and the average into the array of averages. Return the
+# two arrays at once, like this:
 # 
 # ```python
 # return counts, averages
 # ```
+# 
+# The runs don't depend on each other, so `ten_thousand_runs_nb` hands them out
+# to all the CPU cores with Numba's `prange`. The runs are split into blocks, and
+# each block gets its own NumPy `Generator`, spawned from one `SeedSequence`, so
+# the blocks draw independent random numbers and no two threads ever share a
+# generator. Within a block the runs use its generator one after another, so
+# passing the same `seed` to `ten_thousand_runs` gives the same results no matter
+# which thread ends up doing which block. The per-run report is not printed here: ten thousand lines of output would only
+# slow the threads down.
 
 # %%
-def ten_thousand_runs():
+from numba import prange
+
+@njit(parallel=True)
+def ten_thousand_runs_nb(rngs, runs_per_rng, prob, simulation_time, wash_time):
+    n = len(rngs) * runs_per_rng
+    counts = np.empty(n, np.int32)
+    averages = np.empty(n)
+    for block in prange(len(rngs)):
+        rng = rngs[block]
+        for i in range(block * runs_per_rng, (block + 1) * runs_per_rng):
+            count, avg_time = simulation_nb(prob, simulation_time, wash_time, rng)
+            counts[i] = count
+            averages[i] = avg_time
+    return counts, averages
+
+def ten_thousand_runs(seed=None):
     """
-    Get lists of ten thousand counts and averages from the simulator.
-    Return the lists like this:
+    Get arrays of ten thousand counts and averages from the simulator.
+    Return the arrays like this:
     return counts, averages
     """
     
-    counts = []
-    averages = []
-    for _ in range(10000):
-        count, avg_time = simulation(0.004, 6000, 150)
-        counts.append(count)
-        averages.append(avg_time)
-    return counts, averages
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(100)]
+    return ten_thousand_runs_nb(rngs, 100, 0.004, 6000, 150)
 
 counts, averages = ten_thousand_runs()
 
+# %%
+# Check that the same seed gives the same runs:
+first_counts, first_averages = ten_thousand_runs(42)
+second_counts, second_averages = ten_thousand_runs(42)
+assert((first_counts == second_counts).all())
+assert((first_averages == second_averages).all())
+
+# %% [markdown]
+# ### All the runs at once
+# 
+# `analytic_simulation` still does one run at a time. Since every run is the same
+# handful of NumPy operations, we can instead do all the runs together as the
+# rows of one two-dimensional array. Sampling a different number of distinct
+# seconds for each row doesn't vectorize well, so `batched_runs` builds the
+# arrivals from the gaps between them instead: the number of seconds from one
+# arrival to the next follows a geometric distribution, and adding the gaps up
+# along each row with `np.cumsum` gives the arrival timestamps. Every row gets
+# enough gaps to reach past `simulation_time`. The arrivals after the end of the
+# simulation don't need to be removed, because a car can't start being washed
+# before it arrives, so they are never counted as served. Like the other
+# versions, `batched_runs` raises `ZeroDivisionError` if a run washes no cars at
+# all, since that run has no average.
+
+# %%
+def batched_runs(n, prob, simulation_time, wash_time, rng=None):
+    if rng is None:
+        rng = np.random.default_rng()
+    expected = simulation_time * prob
+    width = int(expected + 6 * np.sqrt(expected)) + 1
+    arrivals = np.cumsum(rng.geometric(prob, size=(n, width)), axis=1) - 1
+    while arrivals[:, -1].min() < simulation_time:
+        gaps = rng.geometric(prob, size=(n, width))
+        arrivals = np.hstack([arrivals, arrivals[:, -1:] + np.cumsum(gaps, axis=1)])
+    offsets = np.arange(arrivals.shape[1]) * wash_time
+    starts = np.maximum.accumulate(arrivals - offsets, axis=1) + offsets
+    served = starts < simulation_time
+    counts = served.sum(axis=1)
+    if (counts == 0).any():
+        raise ZeroDivisionError("division by zero")
+    averages = np.where(served, starts - arrivals, 0).sum(axis=1) / counts
+    return counts, averages
+
+# %%
+# Check that batched_runs agrees with ten_thousand_runs:
+batched_counts, batched_averages = batched_runs(10000, 0.004, 6000, 150)
+assert_equal(batched_counts.shape, (10000,))
+assert(abs(batched_counts.mean() - counts.mean()) < 0.3)
+assert(abs(batched_averages.mean() - averages.mean()) < 5)
+# This is probabilistic too, so rerun it once if it fails.
+
+first_counts, first_averages = batched_runs(1000, 0.004, 6000, 150, np.random.default_rng(42))
+second_counts, second_averages = batched_runs(1000, 0.004, 6000, 150, np.random.default_rng(42))
+assert((first_counts == second_counts).all())
+assert((first_averages == second_averages).all())
+
 # %% [markdown]
-# To see a graph of your simulated results, run the next cell.
+# To see a graph of your simulated results, run the next cell. Ten thousand
+# points mostly land on top of each other, so instead of drawing every one the
+# graph shades hexagonal bins by how many runs fell in them. The counts are whole
+# numbers, so there are fewer bins across than up, to avoid empty columns in
+# between.
 
 # %%
 import matplotlib.pyplot as plt
 
-plt.style.use('seaborn-whitegrid')
-plt.plot(counts, averages, '.', color='black')
+plt.style.use('seaborn-v0_8-whitegrid')
+plt.hexbin(counts, averages, gridsize=(20, 40), cmap='Greys')
 plt.xlabel("counts")
 plt.ylabel("average wait time")
 
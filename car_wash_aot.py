@@ -0,0 +1,43 @@
+"""Ahead-of-time build of `simulation_nb` from car-wash.py.
+
+Running
+
+    python car_wash_aot.py
+
+compiles the simulation into the extension module `car_wash_sim` next to this
+file. When that module is there, car-wash.py uses it for `simulation_jit`, so
+the first simulation doesn't have to wait for Numba to compile
+`simulation_nb`. `simulate` is a copy of `simulation_nb`, so change both
+together; car-wash.py checks that they agree whenever `car_wash_sim` is built.
+The one difference is that `simulate` draws from Numba's own random stream,
+because exported functions can't take a NumPy `Generator` argument.
+"""
+import os
+
+import numpy as np
+from numba.pycc import CC
+
+cc = CC('car_wash_sim')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+@cc.export('simulate', 'Tuple((i8, f8))(f8, i4, i4)')
+def simulate(prob, simulation_time, wash_time):
+    q = np.empty(simulation_time, np.int32)
+    head = 0
+    tail = 0
+    busy_until = 0
+    total_wait = 0
+    count = 0
+    for current_second in range(simulation_time):
+        if np.random.random() < prob:
+            q[tail] = current_second
+            tail += 1
+        if current_second >= busy_until and head < tail:
+            total_wait += current_second - q[head]
+            head += 1
+            count += 1
+            busy_until = current_second + wash_time
+    return count, total_wait / count
+
+if __name__ == '__main__':
+    cc.compile()
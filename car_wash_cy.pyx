@@ -0,0 +1,131 @@
+# cython: language_level=3
+"""Cython version of `simulation_nb` from car-wash.py, for setups where Numba
+isn't wanted. Build it in place with
+
+    python setup.py build_ext --inplace
+
+The simulation itself runs without the GIL, so `ten_thousand_runs` can spread
+the runs over plain Python threads. Each thread gets one contiguous block of
+runs and does all of them in a single GIL-free loop, since a single run is too
+short to be worth a thread pool task of its own.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+cimport cython
+from libc.stdint cimport uint64_t
+from libc.stdlib cimport free, malloc
+
+
+cdef inline double _next_random(uint64_t *state) noexcept nogil:
+    """Return a float in [0, 1) from a splitmix64 stream. Every run keeps its
+    own `state`, so runs on different threads don't share a generator."""
+    cdef uint64_t z
+    state[0] += <uint64_t>0x9E3779B97F4A7C15
+    z = state[0]
+    z = (z ^ (z >> 30)) * <uint64_t>0xBF58476D1CE4E5B9
+    z = (z ^ (z >> 27)) * <uint64_t>0x94D049BB133111EB
+    z = z ^ (z >> 31)
+    return (z >> 11) * (1.0 / 9007199254740992.0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _simulate(double prob, int simulation_time, int wash_time,
+                   uint64_t seed, int *q, long long *total_wait) noexcept nogil:
+    cdef uint64_t state = seed
+    cdef int current_second
+    cdef int head = 0
+    cdef int tail = 0
+    cdef int busy_until = 0
+    cdef int count = 0
+    for current_second in range(simulation_time):
+        if _next_random(&state) < prob:
+            q[tail] = current_second
+            tail += 1
+        if current_second >= busy_until and head < tail:
+            total_wait[0] += current_second - q[head]
+            head += 1
+            count += 1
+            busy_until = current_second + wash_time
+    return count
+
+
+def simulate(double prob, int simulation_time, int wash_time, seed):
+    """Run one simulation and return `(count, average)` like `simulation_nb`.
+    `seed` is a whole number that picks the random arrivals."""
+    cdef int *q = <int *>malloc(simulation_time * sizeof(int))
+    cdef long long total_wait = 0
+    cdef uint64_t state = seed
+    cdef int count
+    if q == NULL:
+        raise MemoryError()
+    try:
+        with nogil:
+            count = _simulate(prob, simulation_time, wash_time, state, q, &total_wait)
+    finally:
+        free(q)
+    return count, total_wait / count
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef bint _simulate_block(double prob, int simulation_time, int wash_time,
+                          const uint64_t[::1] seeds, int[::1] counts,
+                          double[::1] averages, Py_ssize_t start,
+                          Py_ssize_t stop, int *q) noexcept nogil:
+    """Run simulations `start` to `stop`, one per seed, reusing the queue `q`
+    and filling in `counts` and `averages`. Return False if a run washed no
+    cars."""
+    cdef Py_ssize_t i
+    cdef long long total_wait
+    cdef int count
+    for i in range(start, stop):
+        total_wait = 0
+        count = _simulate(prob, simulation_time, wash_time, seeds[i], q, &total_wait)
+        if count == 0:
+            return False
+        counts[i] = count
+        averages[i] = <double>total_wait / count
+    return True
+
+
+def _run_block(double prob, int simulation_time, int wash_time,
+               const uint64_t[::1] seeds, int[::1] counts, double[::1] averages,
+               Py_ssize_t start, Py_ssize_t stop):
+    """Run one block of `ten_thousand_runs` with a single queue and a single
+    release of the GIL."""
+    cdef int *q = <int *>malloc(simulation_time * sizeof(int))
+    cdef bint ok
+    if q == NULL:
+        raise MemoryError()
+    try:
+        with nogil:
+            ok = _simulate_block(prob, simulation_time, wash_time, seeds,
+                                 counts, averages, start, stop, q)
+    finally:
+        free(q)
+    if not ok:
+        raise ZeroDivisionError("division by zero")
+
+
+def ten_thousand_runs(seed=None, max_workers=None, prob=0.004,
+                      simulation_time=6000, wash_time=150):
+    """Return arrays of ten thousand counts and averages, like
+    `ten_thousand_runs` in car-wash.py, using a pool of `max_workers` threads
+    (one per CPU if not given)."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).generate_state(10000, np.uint64)
+    counts = np.empty(10000, np.int32)
+    averages = np.empty(10000)
+    bounds = np.linspace(0, 10000, max_workers + 1).astype(np.intp)
+    with ThreadPoolExecutor(max_workers) as pool:
+        tasks = [pool.submit(_run_block, prob, simulation_time, wash_time,
+                             seeds, counts, averages, start, stop)
+                 for start, stop in zip(bounds[:-1], bounds[1:])]
+        for task in tasks:
+            task.result()
+    return counts, averages
@@ -0,0 +1,7 @@
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name="car-wash",
+    ext_modules=cythonize("car_wash_cy.pyx"),
+)